@@ -1,11 +1,14 @@
+import io
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from html import escape
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+import pyarrow.parquet as pq
 
 
 # Set page configuration
@@ -40,6 +43,21 @@ st.markdown("""
             border-left: 4px solid #3498db;
             margin: 0.5rem 0;
         }
+        .metric-grid {
+            display: grid;
+            grid-template-columns: 1fr;
+            gap: 0.5rem;
+        }
+        .metric-card .metric-label {
+            display: block;
+            font-size: 0.9rem;
+            color: #6c757d;
+        }
+        .metric-card .metric-value {
+            display: block;
+            font-size: 1.5rem;
+            color: #2c3e50;
+        }
         .insight-box {
             background-color: #e8f4f8;
             padding: 1rem;
@@ -51,77 +69,147 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Data loading and caching
-@st.cache_data
-def load_data():
+DATA_PATH = 'Dataset/National_Achievement_Survey_dataset.csv'
+PARQUET_PATH = 'Dataset/NAS.parquet'
+PROCESSED_PATH = 'Dataset/processed.parquet'
+LO_PATH = 'assets/learning_outcomes.json'
+DATA_MISSING_MESSAGE = "Please ensure National_Achievement_Survey_dataset.csv is in the same directory as this script."
+
+# Location/year metadata, survey counts and per-subject learning-outcome scores
+REQUIRED_COLS_PATTERN = re.compile(
+    r'^(Country|State|District|Year|Number Of (Schools|Students) Surveyed)\b| In (M|Sci|Sst|L)\d'
+)
+# Boilerplate around the outcome code in a cleaned learning-outcome column name
+OUTCOME_NAME_PATTERN = re.compile(r'Average_Performance_Of_Students_In_|_Learning_Outcome')
+CATEGORY_COLS = ['Country', 'State', 'District', 'Year']
+PREVIEW_COL_LIMIT = 10
+MAX_SCATTER_POINTS = 2000
+SUBJECT_COLS = ['Math_Performance', 'Science_Performance', 'SST_Performance', 'Language_Performance']
+PERFORMANCE_COLS = ['Overall_Performance'] + SUBJECT_COLS
+
+# Geographical regions (simplified) used by the District-Level Mapping section
+REGION_MAPPING = {
+    'North': ['Delhi', 'Haryana', 'Himachal Pradesh', 'Jammu and Kashmir', 'Punjab', 'Rajasthan', 'Uttarakhand', 'Uttar Pradesh', 'Chandigarh', 'Ladakh'],
+    'South': ['Andhra Pradesh', 'Karnataka', 'Kerala', 'Tamil Nadu', 'Telangana', 'Puducherry', 'Andaman and Nicobar Islands', 'Lakshadweep'],
+    'East': ['Bihar', 'Jharkhand', 'Odisha', 'West Bengal'],
+    'West': ['Goa', 'Gujarat', 'Maharashtra', 'Dadra and Nagar Haveli and Daman and Diu', 'Nagpur'],
+    'Central': ['Chhattisgarh', 'Madhya Pradesh']
+}
+STATE_TO_REGION = {state: region for region, states in REGION_MAPPING.items() for state in states}
+
+# Plain-text recommendations report: the timestamped header is filled on each download, the body
+# from report_stats() once per data frame
+REPORT_HEADER = (
+    "National Achievement Survey (NAS) Analysis Report\n"
+    "Generated on: {generated}\n"
+)
+REPORT_TEMPLATE = (
+    "\n"
+    "EXECUTIVE SUMMARY:\n"
+    "- National Average Performance: {mean:.1f}%\n"
+    "- Total Districts Analyzed: {districts}\n"
+    "- Performance Range: {min:.1f}% - {max:.1f}%\n"
+    "\n"
+    "TOP PERFORMING STATES:\n"
+    "{top_lines}\n"
+    "\n"
+    "CRITICAL INTERVENTION REQUIRED:\n"
+    "{low_count} districts performing below {low_threshold:.1f}%\n"
+    "\n"
+    "For detailed analysis and recommendations, refer to the full dashboard.\n"
+)
+
+# The loaders below use st.cache_resource (the successor to allow_output_mutation), so every rerun gets
+# the same DataFrame objects back without pickling or hashing them. Those frames are shared across
+# sessions and must be treated as read-only; helpers that take them can then key their caches on identity.
+# Plotly figures cached with st.cache_resource are shared the same way and are only passed to st.plotly_chart.
+HASH_BY_IDENTITY = {pd.DataFrame: id}
+
+def column_dtypes(columns):
+    """Categorical codes for the location and year columns and float32 for the survey counts and learning-outcome scores"""
+    dtype_map = {col: 'category' for col in CATEGORY_COLS if col in columns}
+    dtype_map.update({col: 'float32' for col in columns if ' Learning Outcome ' in col or col.startswith('Number Of ')})
+    return dtype_map
+
+def write_parquet(df, path):
+    """Write df to path atomically, so a concurrent session never reads a half-written file"""
+    # Unique per process and thread, and created with the usual umask permissions unlike mkstemp's 0600
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        df.to_parquet(tmp_path, engine='pyarrow', compression='snappy')
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def ensure_parquet():
+    """Convert the NAS CSV to Parquet once, refreshing it whenever the CSV is newer"""
+    # A deployment that ships only the Parquet copy has no CSV to compare against
+    stale = not os.path.exists(PARQUET_PATH) or (
+        os.path.exists(DATA_PATH) and os.path.getmtime(PARQUET_PATH) < os.path.getmtime(DATA_PATH)
+    )
+    if stale:
+        # A header-only read decides which columns to parse and with which dtypes, so nothing is inferred
+        header = pd.read_csv(DATA_PATH, nrows=0).columns
+        wanted = [col for col in header if REQUIRED_COLS_PATTERN.search(col)]
+        df = pd.read_csv(DATA_PATH, usecols=wanted, dtype=column_dtypes(wanted), engine='c')
+        # Categoricals are written dictionary-encoded and round-trip as category
+        write_parquet(df, PARQUET_PATH)
+    return PARQUET_PATH
+
+def required_columns(path):
+    """List the columns of the Parquet file that the dashboard actually uses"""
+    return [col for col in pq.read_schema(path).names if REQUIRED_COLS_PATTERN.search(col)]
+
+def data_version():
+    """Newest modification time of the CSV and this script; passed to the loaders so an updated dataset is reloaded"""
+    csv_mtime = os.path.getmtime(DATA_PATH) if os.path.exists(DATA_PATH) else 0
+    return max(csv_mtime, os.path.getmtime(__file__))
+
+@st.cache_resource(show_spinner=False)
+def load_data(version):
     """Load and preprocess the NAS dataset"""
     try:
-        # Try to load from uploaded file first
-        df = pd.read_csv('Dataset/National_Achievement_Survey_dataset.csv')
+        # Read the columnar copy of the CSV, converting it on first run
+        path = ensure_parquet()
+        df = pd.read_parquet(path, engine='pyarrow', columns=required_columns(path))
+        # No-op for files written with the dtypes above; upgrades older Parquet copies
+        df = df.astype(column_dtypes(df.columns))
     except:
-        st.error("Please ensure National_Achievement_Survey_dataset.csv is in the same directory as this script.")
+        st.error(DATA_MISSING_MESSAGE)
         st.stop()
     
     return df
 
 
-# Learning Outcomes Data
-learning_outcomes_data = {
-    "L813": "Read textual/non-textual materials with comprehension and identifies the details, characters, main idea and sequence of ideas and events while reading. Significance: Essential for developing strong reading comprehension and analytical skills, crucial for academic success and information processing.",
-    "M601": "Solves problems involving large numbers by applying appropriate operations. Significance: Fundamental for building a strong mathematical foundation, enabling students to handle complex calculations and real-world quantitative problems.",
-    "M606": "Solves problems on daily life situations involving addition and subtraction of fractions / decimals. Significance: Practical application of mathematical concepts, fostering problem-solving skills relevant to everyday scenarios like finance and measurements.",
-    "M620": "Finds out the perimeter and area of rectangular objects in the surroundings like floor of the class room, surfaces of a chalk box etc. Significance: Develops spatial reasoning and practical geometry skills, useful in fields like architecture, engineering, and design.",
-    "M621": "Arranges given/collected information in the form of table, pictograph and bar graph and interprets them. Significance: Crucial for data literacy, enabling students to organize, visualize, and understand information, a key skill in the data-driven world.",
-    "M702": "Interprets the division and multiplication of fractions. Significance: Advances understanding of fractional arithmetic, vital for higher-level mathematics and scientific calculations.",
-    "M705": "Solves problems related to daily life situations involving rational numbers. Significance: Enhances practical mathematical skills, allowing students to apply rational number concepts to real-world financial and measurement contexts.",
-    "M706": "Uses exponential form of numbers to simplify problems involving multiplication and division of large numbers. Significance: Simplifies complex calculations, providing a powerful tool for scientific notation and understanding exponential growth/decay.",
-    "M707": "Adds/subtracts algebraic expressions. Significance: Introduces foundational algebraic skills, essential for solving equations and understanding mathematical relationships.",
-    "M710": "Solves problems related to conversion of percentage to fraction and decimal and vice versa. Significance: Develops versatility in numerical representation, critical for financial literacy, statistics, and data interpretation.",
-    "M717": "Finds out approximate area of closed shapes by using unit square grid/graph sheet. Significance: Fosters estimation and approximation skills, useful in various practical applications where precise measurements are not always feasible.",
-    "M719": "Finds various representative values for simple data from her/his daily life contexts like mean, median and mode. Significance: Introduces basic statistical concepts, enabling students to analyze and summarize data from their environment.",
-    "M721": "Interprets data using bar graph. Significance: Enhances data visualization and interpretation skills, allowing students to draw conclusions from graphical representations.",
-    "M801": "Generalizes properties of addition, subtraction, multiplication and division of rational numbers through patterns. Significance: Deepens understanding of number properties, crucial for advanced mathematical reasoning and abstract thinking.",
-    "M802": "Finds rational numbers between two given rational numbers. Significance: Reinforces understanding of number density and rational number properties, important for number theory and advanced mathematics.",
-    "M803": "Proves divisibility rules of 2, 3,4, 5, 6, 9 and 11. Significance: Develops number sense and logical reasoning, useful for mental math and understanding number theory.",
-    "M804": "Finds squares, cubes, square roots and cube roots of numbers using different methods. Significance: Builds foundational skills in exponents and roots, essential for algebra, geometry, and various scientific calculations.",
-    "M808": "Uses various algebraic identities in solving problems of daily life. Significance: Applies algebraic concepts to practical situations, enhancing problem-solving abilities in diverse contexts.",
-    "M812": "Verifies properties of parallelogram and establishes the relationship between them through reasoning. Significance: Develops geometric reasoning and proof skills, fundamental for advanced geometry and spatial analysis.",
-    "M818": "Finds surface area and volume of cuboidal and cylindrical object. Significance: Essential for understanding 3D shapes and their properties, with applications in engineering, design, and packaging.",
-    "M819": "Draws and interprets bar charts and pie charts. Significance: Strengthens data visualization and interpretation skills, enabling effective communication of data insights.",
-    "SCI703": "Classifies materials and organisms based on properties/characteristics. Significance: Develops observational and categorization skills, foundational for scientific inquiry and understanding biological and chemical diversity.",
-    "SCI704": "Conducts simple investigation to seek answers to queries. Significance: Fosters scientific inquiry and experimental design skills, crucial for hands-on learning and problem-solving in science.",
-    "SCI705": "Relates processes and phenomenon with causes. Significance: Promotes critical thinking and cause-and-effect reasoning, essential for understanding scientific principles and natural phenomena.",
-    "SCI708": "Measures and calculates eg, temperature; pulse rate; speed of moving objects; time period of a simple pendulum, etc. Significance: Develops practical measurement and calculation skills, vital for experimental science and data collection.",
-    "SCI710": "Plots and interprets graphs. Significance: Enhances data analysis and visualization skills, allowing students to understand trends and relationships in scientific data.",
-    "SCI711": "Constructs models using materials from surroundings and explains their working. Significance: Encourages creativity and practical application of scientific knowledge, fostering hands-on learning and understanding of scientific principles.",
-    "SCI801": "Differentiates materials, organism and processes. Significance: Refines classification and analytical skills, crucial for understanding the diversity and complexity of the natural world.",
-    "SCI804": "Relates processes and phenomenon with causes. Significance: Deepens understanding of scientific causality, enabling students to explain and predict natural events.",
-    "SCI805": "Explains processes and phenomenon. Significance: Develops clear and concise scientific communication skills, essential for conveying complex ideas.",
-    "SCI807": "Measures angles of incidence and reflection, etc. Significance: Applies geometric principles to optics, fundamental for understanding light and its behavior.",
-    "SCI811": "Applies learning of scientific concepts in day-to-day life. Significance: Connects classroom learning to real-world applications, making science relevant and practical.",
-    "SCI813": "Makes efforts to protect environment. Significance: Fosters environmental awareness and responsibility, promoting sustainable practices and civic engagement.",
-    "SST605": "Identifies latitudes and longitudes, eg, poles, equator, tropics, States/UTs of India and other neighboring countries on globe and the world map. Significance: Develops geographical literacy and spatial awareness, essential for understanding global locations and navigation.",
-    "SST610": "Locates important historical sites, places on an outline map of India. Significance: Enhances historical and geographical knowledge, connecting historical events to their physical locations.",
-    "SST625": "Describes the functioning of rural and urban local government bodies in sectors like health and education. Significance: Promotes civic knowledge and understanding of local governance, empowering students to engage with their communities.",
-    "SST703": "Explains preventive actions to be undertaken in the event of disasters. Significance: Develops awareness of disaster preparedness and safety measures, crucial for personal and community well-being.",
-    "SST704": "Describes formation of landforms due to various factors. Significance: Enhances understanding of geological processes and physical geography, explaining the Earth's diverse landscapes.",
-    "SST722": "Explains the significance of equality in democracy. Significance: Fosters civic values and understanding of democratic principles, promoting social justice and human rights.",
-    "SST726": "Describes the process of election to the legislative assembly. Significance: Educates students on democratic processes and electoral systems, encouraging informed participation in governance.",
-    "SST731": "Explains the functioning of media with appropriate examples from newspapers. Significance: Develops media literacy and critical thinking about information sources, essential for navigating the modern information landscape.",
-    "SST733": "Differentiates between different kinds of markets. Significance: Introduces economic concepts and market structures, providing foundational knowledge for understanding commerce and trade.",
-    "SST734": "Traces how goods travel through various market places. Significance: Explains supply chains and economic flows, illustrating the journey of products from production to consumption.",
-    "SST802": "Describes major crops, types of farming and agricultural practices in her/his own area/state. Significance: Connects students to local agriculture and food systems, fostering understanding of economic geography and sustainability.",
-    "SST805": "Locates distribution of important minerals eg coal and mineral oil on the world map. Significance: Enhances geographical knowledge of natural resources and their global distribution, relevant to economics and environmental studies.",
-    "SST807": "Justifies judicious use of natural resources. Significance: Promotes environmental stewardship and sustainable resource management, encouraging responsible consumption and conservation.",
-    "SST809": "Draws interrelationship between types of farming and development in different regions of the world. Significance: Develops understanding of global economic patterns and the impact of agriculture on regional development.",
-    "SST810": "Distinguishes the modern period from the medieval and the ancient periods through the use of sources. Significance: Fosters historical periodization and source analysis skills, crucial for understanding historical change and continuity.",
-    "SST815": "Explains the origin, nature and spread of the revolt of 1857 and the lessons learned from it. Significance: Provides historical context on a pivotal event in Indian history, fostering understanding of colonial rule and resistance movements.",
-    "SST816": "Analyses the decline of pre-existing urban centers and handicraft industries and the development of new urban centers and industries in India during the colonial period. Significance: Explores the economic and social impact of colonialism, highlighting historical transformations in urban and industrial landscapes.",
-    "SST818": "Analyses the issues related to caste, women, widow remarriage, child marriage, social reforms and the laws and policies of colonial administration towards these issues. Significance: Examines social justice issues and historical reform movements, promoting critical awareness of social inequalities and legal frameworks.",
-    "SST823": "Applies the knowledge of the Fundamental Rights to find out about their violation, protection and promotion in a given situation. Significance: Empowers students with knowledge of their rights and legal protections, fostering civic engagement and advocacy.",
-    "SST827": "Describes the process of making a law (eg Domestic Violence Act, RTI Act, RTE Act). Significance: Educates students on legislative processes and the creation of laws, promoting understanding of legal frameworks and their societal impact.",
-    "SST831": "Identifies the role of Government in providing public facilities such as water, sanitation, road, electricity etc, and recognizes their availability. Significance: Promotes understanding of public services and government responsibilities, fostering civic awareness and engagement with local infrastructure.",
-    "SST833": "Draws bar diagram to show population of different countries/India/states. Significance: Develops data visualization skills in a geographical context, enabling students to represent and interpret demographic data."
-}
+def split_learning_outcome(lo_description):
+    """Split a learning outcome's text into its description and significance"""
+    parts = lo_description.split(". Significance: ")
+    return parts[0], parts[1] if len(parts) > 1 else "N/A"
+
+def group_learning_outcomes(outcomes):
+    """Bucket (code, description, significance) tuples by the code's subject prefix"""
+    grouped = {}
+    for lo_code, lo_description in outcomes.items():
+        prefix = re.match(r'[A-Z]+', lo_code).group()
+        grouped.setdefault(prefix, []).append((lo_code, *split_learning_outcome(lo_description)))
+    return grouped
+
+@st.cache_resource(show_spinner=False)
+def load_learning_outcomes():
+    """Read the learning outcome descriptions, grouped by subject prefix, only when the section is opened"""
+    with open(LO_PATH, encoding='utf-8') as f:
+        return group_learning_outcomes(json.load(f))
+
+@st.cache_data
+def render_subject_html(prefix):
+    """Render every learning outcome of one subject as a single HTML block"""
+    return "".join(
+        f'<p><b>{lo_code}:</b> {escape(description)}</p>'
+        f'<div class="insight-box"><b>Significance:</b> {escape(significance)}</div>'
+        for lo_code, description, significance in load_learning_outcomes().get(prefix, [])
+    )
 
 def show_learning_outcomes():
     st.markdown("<div class=\"section-header\">🎯 Detailed Learning Outcomes</div>", unsafe_allow_html=True)
@@ -139,45 +227,88 @@ def show_learning_outcomes():
 
     for prefix, subject_name in subject_categories.items():
         st.markdown(f"### {subject_name} Learning Outcomes")
-        for lo_code, lo_description in learning_outcomes_data.items():
-            if lo_code.startswith(prefix):
-                parts = lo_description.split(". Significance: ")
-                description = parts[0]
-                significance = parts[1] if len(parts) > 1 else "N/A"
-                
-                st.markdown(f"**{lo_code}:** {description}")
-                st.info(f"**Significance:** {significance}")
+        st.markdown(render_subject_html(prefix), unsafe_allow_html=True)
 
 
-@st.cache_data
+def subject_columns(columns):
+    """Split the cleaned learning-outcome columns by subject using the outcome code prefix"""
+    subject = columns.to_series().str.extract(r'_In_(Sci|Sst|M|L)(?=\d)', expand=False).to_numpy()
+    math_cols = columns[subject == 'M'].tolist()
+    science_cols = columns[subject == 'Sci'].tolist()
+    sst_cols = columns[subject == 'Sst'].tolist()
+    language_cols = columns[subject == 'L'].tolist()
+    return math_cols, science_cols, sst_cols, language_cols
+
 def preprocess_data(df):
     """Clean and preprocess the dataset"""
     # Clean column names
-    cols = df.columns
-    new_cols = []
-    for col in cols:
-        new_col = col.split('(')[0].strip().replace(' ', '_')
-        new_cols.append(new_col)
-    df.columns = new_cols
+    df.columns = df.columns.str.split('(', n=1).str[0].str.strip().str.replace(' ', '_', regex=False)
     
-    # Extract year from the Year column
-    df['Year'] = df['Year'].astype(str).str.extract(r'(\d{4})').astype(int)
+    # Extract year from the Year column ("Calendar Year (Jan - Dec), 2021" ends in the year); only the
+    # few distinct labels are parsed, and the rows pick up their year through the category codes.
+    # A missing label has code -1; it is masked to <NA> rather than picking up the last category's year
+    years = df['Year'].cat.categories.str.strip().str[-4:].astype('int16').to_numpy()
+    year_codes = df['Year'].cat.codes.to_numpy()
+    df['Year'] = pd.arrays.IntegerArray(years[year_codes], year_codes < 0)
     
     # Identify subject-specific columns
-    math_cols = [col for col in df.columns if '_In_M' in col]
-    science_cols = [col for col in df.columns if '_In_Sci' in col]
-    sst_cols = [col for col in df.columns if '_In_Sst' in col]
-    language_cols = [col for col in df.columns if '_In_L' in col]
-    
-    # Calculate subject-wise performance scores
-    df['Math_Performance'] = df[math_cols].mean(axis=1)
-    df['Science_Performance'] = df[science_cols].mean(axis=1)
-    df['SST_Performance'] = df[sst_cols].mean(axis=1)
-    df['Language_Performance'] = df[language_cols].mean(axis=1)
-    df['Overall_Performance'] = df[['Math_Performance', 'Science_Performance', 'SST_Performance', 'Language_Performance']].mean(axis=1)
+    math_cols, science_cols, sst_cols, language_cols = subject_columns(df.columns)
+    
+    # Calculate subject-wise performance scores in one pass over the contiguous score block,
+    # skipping missing outcomes like DataFrame.mean does
+    subject_groups = [math_cols, science_cols, sst_cols, language_cols]
+    values = df[math_cols + science_cols + sst_cols + language_cols].to_numpy(dtype=np.float32)
+    valid = ~np.isnan(values)
+    # reduceat has no empty runs, so only subjects with outcome columns are reduced; a subject
+    # without any keeps a NaN sum and zero count, giving NaN like the mean of no columns
+    sizes = np.array([len(cols) for cols in subject_groups])
+    present = sizes > 0
+    starts = (np.cumsum(sizes) - sizes)[present]
+    sums = np.full((len(df), len(subject_groups)), np.nan)
+    counts = np.zeros((len(df), len(subject_groups)), dtype=np.int64)
+    if present.any():
+        sums[:, present] = np.add.reduceat(np.where(valid, values, 0), starts, axis=1, dtype=np.float64)
+        counts[:, present] = np.add.reduceat(valid, starts, axis=1, dtype=np.int64)
+    with np.errstate(invalid='ignore'):
+        subject_scores = sums / counts
+        # Overall is the mean of the available subject scores, again skipping missing ones
+        scored = ~np.isnan(subject_scores)
+        overall = np.where(scored, subject_scores, 0).sum(axis=1) / scored.sum(axis=1)
+    
+    # Percentages need no more than float32, which halves the bandwidth of every later aggregation
+    df[SUBJECT_COLS + ['Overall_Performance']] = np.column_stack([subject_scores, overall]).astype(np.float32)
     
     return df, math_cols, science_cols, sst_cols, language_cols
 
+def ensure_processed():
+    """Write the preprocessed Parquet copy unless it is newer than its inputs"""
+    # The copy is stale once the raw data or the preprocessing code in this script is newer
+    inputs_mtime = max(os.path.getmtime(ensure_parquet()), os.path.getmtime(__file__))
+    if not os.path.exists(PROCESSED_PATH) or os.path.getmtime(PROCESSED_PATH) < inputs_mtime:
+        # preprocess_data renames and adds columns in place, so give it its own copy
+        df_processed = preprocess_data(load_data(data_version()).copy())[0]
+        write_parquet(df_processed, PROCESSED_PATH)
+    return PROCESSED_PATH
+
+@st.cache_resource(show_spinner=False)
+def get_processed(version):
+    """Load the full preprocessed dataset along with its subject column lists"""
+    try:
+        df_processed = pd.read_parquet(ensure_processed(), engine='pyarrow')
+    except (OSError, ValueError):
+        st.error(DATA_MISSING_MESSAGE)
+        st.stop()
+    return (df_processed, *subject_columns(df_processed.columns))
+
+@st.cache_resource(show_spinner=False)
+def load_year(year, version):
+    """Load the preprocessed rows for one survey year, filtering inside the Parquet reader"""
+    try:
+        return pq.read_table(ensure_processed(), filters=[('Year', '==', year)]).to_pandas()
+    except (OSError, ValueError):
+        st.error(DATA_MISSING_MESSAGE)
+        st.stop()
+
 # Main application
 def main():
     # Title
@@ -196,12 +327,15 @@ def main():
     
     selected_section = st.sidebar.selectbox("Choose a section:", sections)
     
-    # Load and preprocess data
-    df = load_data()
-    df_processed, math_cols, science_cols, sst_cols, language_cols = preprocess_data(df)
-    
-    # Filter data for 2021 (most recent year)
-    df_2021 = df_processed[df_processed['Year'] == 2021].copy()
+    # Load only what the selected section needs; the analysis sections never see other years.
+    # The cached frames are keyed on the data version, so replacing the CSV reloads them
+    version = data_version()
+    if selected_section in ("🏠 Home & Dataset Overview", "🔧 Data Preprocessing"):
+        df = load_data(version)
+        df_processed, math_cols, science_cols, sst_cols, language_cols = get_processed(version)
+    elif selected_section != "🎯 Detailed Learning Outcomes":
+        # Filter data for 2021 (most recent year)
+        df_2021 = load_year(2021, version)
     
     if selected_section == "🏠 Home & Dataset Overview":
         show_home_and_overview(df, df_processed)
@@ -218,6 +352,18 @@ def main():
     elif selected_section == "🎯 Detailed Learning Outcomes":
         show_learning_outcomes()
 
+@st.cache_data(hash_funcs=HASH_BY_IDENTITY)
+def overview_stats(df_processed):
+    """Headline dataset counts shown on the Home page"""
+    # The location columns are categoricals built from the full dataset, so every category occurs
+    # and the category count equals nunique() without scanning the rows
+    return {
+        'rows': len(df_processed),
+        'districts': df_processed['District'].cat.categories.size,
+        'states': df_processed['State'].cat.categories.size,
+        'learning_outcomes': sum('Learning_Outcome' in col for col in df_processed.columns)
+    }
+
 def show_home_and_overview(df, df_processed):
     """Display home page and dataset overview"""
     st.markdown('<div class="section-header">🏠 Welcome to NAS Analysis Dashboard</div>', unsafe_allow_html=True)
@@ -258,43 +404,40 @@ def show_home_and_overview(df, df_processed):
         """, unsafe_allow_html=False)
     
     with col2:
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        st.metric("📅 Year Range", "2017 - 2021")
-        st.markdown('</div>', unsafe_allow_html=True)
-        
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        st.metric("🌍 Geographic Coverage", "State & District Level")
-        st.markdown('</div>', unsafe_allow_html=True)
-        
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        st.metric("📊 Data Frequency", "Yearly")
-        st.markdown('</div>', unsafe_allow_html=True)
-        
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        st.metric("🏫 Sector", "Education & Training")
-        st.markdown('</div>', unsafe_allow_html=True)
-        
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        st.metric("📈 Last Updated", "July 09, 2025")
-        st.markdown('</div>', unsafe_allow_html=True)
+        dataset_facts = [
+            ("📅 Year Range", "2017 - 2021"),
+            ("🌍 Geographic Coverage", "State & District Level"),
+            ("📊 Data Frequency", "Yearly"),
+            ("🏫 Sector", "Education & Training"),
+            ("📈 Last Updated", "July 09, 2025")
+        ]
+        # One markdown element for all cards instead of three widgets per card
+        cards = "".join(
+            f'<div class="metric-card"><span class="metric-label">{label}</span>'
+            f'<span class="metric-value">{escape(value)}</span></div>'
+            for label, value in dataset_facts
+        )
+        st.markdown(f'<div class="metric-grid">{cards}</div>', unsafe_allow_html=True)
     
     # Dataset Statistics
     st.markdown('<div class="section-header">📊 Dataset Statistics</div>', unsafe_allow_html=True)
     
+    stats = overview_stats(df_processed)
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Records", f"{len(df):,}")
+        st.metric("Total Records", f"{stats['rows']:,}")
     with col2:
-        st.metric("Districts Covered", f"{df['District'].nunique():,}")
+        st.metric("Districts Covered", f"{stats['districts']:,}")
     with col3:
-        st.metric("States/UTs", f"{df['State'].nunique()}")
+        st.metric("States/UTs", f"{stats['states']}")
     with col4:
-        st.metric("Learning Outcomes", f"{len([col for col in df.columns if 'Learning_Outcome' in col])}")
+        st.metric("Learning Outcomes", f"{stats['learning_outcomes']}")
     
     # Sample data preview
     st.markdown('<div class="section-header">👀 Data Preview</div>', unsafe_allow_html=True)
-    st.dataframe(df.head(), use_container_width=True)
+    # Only the metadata, survey counts and first few outcomes are serialized to the browser
+    st.dataframe(df.iloc[:5, :PREVIEW_COL_LIMIT], use_container_width=True, hide_index=True)
     
     # Data collection methodology
     st.markdown('<div class="section-header">🔬 Data Collection Methodology</div>', unsafe_allow_html=True)
@@ -319,6 +462,17 @@ def show_home_and_overview(df, df_processed):
         - **Resource Allocation:** Helps prioritize educational investments
         """, unsafe_allow_html=False)
 
+@st.cache_data(hash_funcs=HASH_BY_IDENTITY)
+def quality_report(df_processed):
+    """Missing-value, duplicate-row and dtype counts for the processed dataset"""
+    # isnull().values.sum() is one reduction over the NumPy mask, with no per-column Series.
+    # Dtypes are counted by name: each column's CategoricalDtype compares unequal to the others
+    return (
+        int(df_processed.isnull().values.sum()),
+        int(df_processed.duplicated().sum()),
+        df_processed.dtypes.astype(str).nunique()
+    )
+
 def show_preprocessing(df, df_processed, math_cols, science_cols, sst_cols, language_cols):
     """Display data preprocessing steps and results"""
     st.markdown('<div class="section-header">🔧 Data Preprocessing Pipeline</div>', unsafe_allow_html=True)
@@ -376,7 +530,7 @@ def show_preprocessing(df, df_processed, math_cols, science_cols, sst_cols, lang
         st.metric("Count", len(math_cols))
         with st.expander("View Math Columns"):
             for col in math_cols[:5]:  # Show first 5
-                st.text(col.replace('Average_Performance_Of_Students_In_', '').replace('_Learning_Outcome', ''))
+                st.text(OUTCOME_NAME_PATTERN.sub('', col))
             if len(math_cols) > 5:
                 st.text(f"... and {len(math_cols)-5} more")
     
@@ -385,7 +539,7 @@ def show_preprocessing(df, df_processed, math_cols, science_cols, sst_cols, lang
         st.metric("Count", len(science_cols))
         with st.expander("View Science Columns"):
             for col in science_cols[:5]:
-                st.text(col.replace('Average_Performance_Of_Students_In_', '').replace('_Learning_Outcome', ''))
+                st.text(OUTCOME_NAME_PATTERN.sub('', col))
             if len(science_cols) > 5:
                 st.text(f"... and {len(science_cols)-5} more")
     
@@ -394,7 +548,7 @@ def show_preprocessing(df, df_processed, math_cols, science_cols, sst_cols, lang
         st.metric("Count", len(sst_cols))
         with st.expander("View SST Columns"):
             for col in sst_cols[:5]:
-                st.text(col.replace('Average_Performance_Of_Students_In_', '').replace('_Learning_Outcome', ''))
+                st.text(OUTCOME_NAME_PATTERN.sub('', col))
             if len(sst_cols) > 5:
                 st.text(f"... and {len(sst_cols)-5} more")
     
@@ -403,7 +557,7 @@ def show_preprocessing(df, df_processed, math_cols, science_cols, sst_cols, lang
         st.metric("Count", len(language_cols))
         with st.expander("View Language Columns"):
             for col in language_cols[:5]:
-                st.text(col.replace('Average_Performance_Of_Students_In_', '').replace('_Learning_Outcome', ''))
+                st.text(OUTCOME_NAME_PATTERN.sub('', col))
             if len(language_cols) > 5:
                 st.text(f"... and {len(language_cols)-5} more")
     
@@ -421,13 +575,14 @@ def show_preprocessing(df, df_processed, math_cols, science_cols, sst_cols, lang
     """, unsafe_allow_html=False)
     
     # Show sample calculations
-    sample_district = df_processed.iloc[0]
+    sample_district = df_processed.iloc[0][['District', 'State', 'Math_Performance', 'Science_Performance',
+                                            'SST_Performance', 'Overall_Performance']].to_dict()
     
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("**Sample District Performance:**")
-        st.markdown("**District:** {sample_district['District']}, {sample_district['State]}")
+        st.markdown(f"**District:** {sample_district['District']}, {sample_district['State']}")
         st.metric("Math Performance", f"{sample_district['Math_Performance']:.2f}%")
         st.metric("Science Performance", f"{sample_district['Science_Performance']:.2f}%")
     
@@ -440,19 +595,17 @@ def show_preprocessing(df, df_processed, math_cols, science_cols, sst_cols, lang
     # Data Quality Check
     st.markdown("### Step 5: Data Quality Assessment")
     
+    missing_data, duplicate_rows, data_types = quality_report(df_processed)
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        missing_data = df_processed.isnull().sum().sum()
         st.metric("Missing Values", missing_data)
     
     with col2:
-        duplicate_rows = df_processed.duplicated().sum()
         st.metric("Duplicate Rows", duplicate_rows)
     
     with col3:
-        data_types = df_processed.dtypes.value_counts()
-        st.metric("Data Types", len(data_types))
+        st.metric("Data Types", data_types)
     
     # Final dataset preview
     st.markdown("### Processed Dataset Preview")
@@ -462,168 +615,269 @@ def show_preprocessing(df, df_processed, math_cols, science_cols, sst_cols, lang
                    'Number_Of_Students_Surveyed', 'Math_Performance', 'Science_Performance', 
                    'SST_Performance', 'Language_Performance', 'Overall_Performance']
     
-    st.dataframe(df_processed[display_cols].head(10), use_container_width=True)
+    st.dataframe(
+        df_processed[display_cols].head(10),
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'Year': st.column_config.NumberColumn(format="%d"),
+            **{col: st.column_config.NumberColumn(format="%.2f") for col in display_cols if col.endswith('_Performance')}
+        }
+    )
+
+# Aggregations shared by the analysis sections, cached so widget reruns don't rescan the 2021 frame
+@st.cache_data(hash_funcs=HASH_BY_IDENTITY)
+def performance_summary(df_2021):
+    """National mean, standard deviation and range of each performance score"""
+    return df_2021[PERFORMANCE_COLS].agg(['mean', 'std', 'min', 'max'])
+
+@st.cache_data(hash_funcs=HASH_BY_IDENTITY)
+def state_means(df_2021):
+    """Mean of each performance score per state"""
+    # Sort rows by state code once and reduce each contiguous run, skipping missing scores like groupby().mean()
+    codes = df_2021['State'].cat.codes.to_numpy()
+    # Rows without a State have code -1; groupby() drops them, so they are left out of the sort
+    order = np.flatnonzero(codes >= 0)
+    order = order[np.argsort(codes[order], kind='stable')]
+    sorted_codes = codes[order]
+    edges = np.concatenate([[0], np.flatnonzero(np.diff(sorted_codes)) + 1])
+    values = df_2021[PERFORMANCE_COLS].to_numpy(dtype=np.float64)[order]
+    valid = ~np.isnan(values)
+    sums = np.add.reduceat(np.where(valid, values, 0), edges, axis=0)
+    counts = np.add.reduceat(valid, edges, axis=0, dtype=np.int64)
+    with np.errstate(invalid='ignore'):
+        means = (sums / counts).astype(np.float32)
+    states = pd.Index(df_2021['State'].cat.categories[sorted_codes[edges]], name='State')
+    return pd.DataFrame(means, index=states, columns=PERFORMANCE_COLS)
+
+@st.cache_data(hash_funcs=HASH_BY_IDENTITY)
+def district_means(df_2021):
+    """Mean overall performance per district"""
+    district_scores = df_2021[['State', 'District', 'Overall_Performance']]
+    # A survey year normally has one row per district, in which case each row already is the mean
+    if not district_scores.duplicated(['State', 'District']).any():
+        return district_scores.reset_index(drop=True)
+    return district_scores.groupby(['State', 'District'], observed=True)['Overall_Performance'].mean().reset_index()
+
+@st.cache_data(hash_funcs=HASH_BY_IDENTITY)
+def subject_correlation(df_2021):
+    """Correlation matrix of the four subject scores"""
+    scores = df_2021[SUBJECT_COLS].to_numpy(np.float32)
+    missing = np.isnan(scores)
+    # When districts miss either all subjects or none, dropping incomplete rows matches corr()'s
+    # pairwise handling and the whole block is correlated in one call; partial gaps need pairwise
+    if (missing.any(axis=1) != missing.all(axis=1)).any():
+        return df_2021[SUBJECT_COLS].corr()
+    scores = scores[~missing.any(axis=1)]
+    return pd.DataFrame(np.corrcoef(scores, rowvar=False), index=SUBJECT_COLS, columns=SUBJECT_COLS)
+
+@st.cache_data(hash_funcs=HASH_BY_IDENTITY)
+def topic_means(df_2021):
+    """National mean of each learning outcome, indexed by outcome code"""
+    # Same subject split as preprocessing, so only the learning-outcome block is reduced
+    learning_outcome_cols = pd.Index([col for cols in subject_columns(df_2021.columns) for col in cols])
+    # One NaN-aware reduction over the contiguous float32 block instead of a per-column mean
+    topic_scores = np.nanmean(df_2021[learning_outcome_cols].to_numpy(np.float32), axis=0)
+    
+    # Clean up the names for better readability
+    return pd.Series(topic_scores, index=learning_outcome_cols.str.replace(OUTCOME_NAME_PATTERN, '', regex=True))
+
+@st.cache_resource(show_spinner=False, hash_funcs=HASH_BY_IDENTITY)
+def with_region(df_2021):
+    """df_2021 plus a categorical Region column, built once per data frame"""
+    # Look up each State category once, then remap the row codes; no per-row lookups.
+    # A trailing 'Other' slot takes the rows without a State, whose code is -1
+    state_categories = df_2021['State'].cat.categories
+    state_codes = df_2021['State'].cat.codes.to_numpy()
+    category_regions = pd.Categorical(np.append(state_categories.map(STATE_TO_REGION).fillna('Other').to_numpy(), 'Other'))
+    region_codes = category_regions.codes[np.where(state_codes >= 0, state_codes, len(state_categories))]
+    
+    # Add region information without deep-copying df_2021 first; the year's Parquet slice keeps the
+    # full State dictionary, so regions with no rows in it are dropped from the categories
+    return df_2021.assign(
+        Region=pd.Categorical.from_codes(region_codes, categories=category_regions.categories).remove_unused_categories()
+    )
+
+@st.cache_data(hash_funcs=HASH_BY_IDENTITY)
+def regional_stats(df_2021_with_region):
+    """Mean and std of each performance score per region, as flat mean_<col>/std_<col> columns"""
+    # Named aggregations produce the flat column names directly, with no MultiIndex to flatten
+    aggregations = {f'{stat}_{col}': (col, stat) for col in PERFORMANCE_COLS for stat in ('mean', 'std')}
+    return df_2021_with_region.groupby('Region', observed=True).agg(**aggregations).round(2).reset_index()
+
+@st.cache_data(hash_funcs=HASH_BY_IDENTITY)
+def score_histograms(df_2021, bins=30):
+    """Bin centers, widths and counts of each performance score"""
+    histograms = {}
+    for col in PERFORMANCE_COLS:
+        values = df_2021[col].to_numpy()
+        counts, edges = np.histogram(values[~np.isnan(values)], bins=bins)
+        histograms[col] = ((edges[:-1] + edges[1:]) / 2, np.diff(edges), counts)
+    return histograms
+
+@st.fragment
+def show_state_comparison(state_performance):
+    """Subject comparison for the selected states; changing the selection reruns only this block"""
+    import plotly.express as px
+    
+    # Subject-wise State Comparison
+    st.markdown("### 📚 Subject-wise State Performance Comparison")
+    
+    # Select states for comparison
+    selected_states = st.multiselect(
+        "Select states to compare:",
+        options=state_performance.index.tolist(),
+        default=state_performance.head(5).index.tolist(),
+        max_selections=10
+    )
+    
+    if selected_states:
+        comparison_data = state_performance.loc[selected_states, SUBJECT_COLS]
+        
+        # One long-form frame lets plotly build all subject traces in a single call
+        comparison_long = comparison_data.reset_index().melt(id_vars='State', var_name='Subject', value_name='Score')
+        comparison_long['Subject'] = comparison_long['Subject'].str.replace('_Performance', '')
+        
+        fig_comparison = px.bar(
+            comparison_long,
+            x='State',
+            y='Score',
+            color='Subject',
+            text_auto='.1f'
+        )
+        fig_comparison.update_layout(
+            title="Subject-wise Performance Comparison",
+            xaxis_title="States/UTs",
+            yaxis_title="Performance Score (%)",
+            barmode='group',
+            height=500
+        )
+        
+        st.plotly_chart(fig_comparison, use_container_width=True)
+
+@st.cache_resource(show_spinner=False, hash_funcs=HASH_BY_IDENTITY)
+def score_distribution_figure(df_2021):
+    """Histogram grid of the performance scores, built once per data frame and reused across reruns"""
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    
+    fig = make_subplots(
+        rows=2, cols=2,
+        subplot_titles=('Overall Performance', 'Mathematics', 'Science', 'Social Science'),
+        specs=[[{"secondary_y": False}, {"secondary_y": False}],
+               [{"secondary_y": False}, {"secondary_y": False}]]
+    )
+    
+    # Bins are counted server-side, so only 30 bars per subject are sent instead of every district's score
+    histograms = score_histograms(df_2021)
+    for column, name, row, col in [('Overall_Performance', 'Overall', 1, 1), ('Math_Performance', 'Math', 1, 2),
+                                   ('Science_Performance', 'Science', 2, 1), ('SST_Performance', 'SST', 2, 2)]:
+        centers, widths, counts = histograms[column]
+        fig.add_trace(
+            go.Bar(x=centers, y=counts, width=widths, name=name, opacity=0.7),
+            row=row, col=col
+        )
+    
+    fig.update_layout(height=600, showlegend=False, title_text="Distribution of Performance Scores Across Districts")
+    return fig
+
+@st.cache_resource(show_spinner=False, hash_funcs=HASH_BY_IDENTITY)
+def correlation_figure(df_2021):
+    """Heatmap of the subject correlation matrix, built once per data frame and reused across reruns"""
+    import plotly.express as px
+
+    fig_corr = px.imshow(
+        subject_correlation(df_2021),
+        text_auto='.2f',
+        aspect="auto",
+        title="Correlation Matrix of Subject Performances",
+        color_continuous_scale='RdBu'
+    )
+    fig_corr.update_layout(height=500)
+    return fig_corr
 
 def show_eda(df_2021):
     """Display exploratory data analysis"""
+    # Plotting libraries are imported lazily so text-only sections don't pay for them
+    import plotly.express as px
+    
     st.markdown('<div class="section-header">📈 Exploratory Data Analysis (2021 Data)</div>', unsafe_allow_html=True)
     
     # National Summary Statistics
     st.markdown("### 📊 National Performance Summary")
     
-    performance_cols = ['Overall_Performance', 'Math_Performance', 'Science_Performance', 'SST_Performance', 'Language_Performance']
-    summary_stats = df_2021[performance_cols].describe()
+    summary_stats = performance_summary(df_2021)
     
     col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
         st.metric("Overall Performance", 
-                 f"{summary_stats.loc['mean', 'Overall_Performance']:.1f}%",
-                 f"±{summary_stats.loc['std', 'Overall_Performance']:.1f}%")
+                 f"{summary_stats.at['mean', 'Overall_Performance']:.1f}%",
+                 f"±{summary_stats.at['std', 'Overall_Performance']:.1f}%")
     
     with col2:
         st.metric("Mathematics", 
-                 f"{summary_stats.loc['mean', 'Math_Performance']:.1f}%",
-                 f"±{summary_stats.loc['std', 'Math_Performance']:.1f}%")
+                 f"{summary_stats.at['mean', 'Math_Performance']:.1f}%",
+                 f"±{summary_stats.at['std', 'Math_Performance']:.1f}%")
     
     with col3:
         st.metric("Science", 
-                 f"{summary_stats.loc['mean', 'Science_Performance']:.1f}%",
-                 f"±{summary_stats.loc['std', 'Science_Performance']:.1f}%")
+                 f"{summary_stats.at['mean', 'Science_Performance']:.1f}%",
+                 f"±{summary_stats.at['std', 'Science_Performance']:.1f}%")
     
     with col4:
         st.metric("Social Science", 
-                 f"{summary_stats.loc['mean', 'SST_Performance']:.1f}%",
-                 f"±{summary_stats.loc['std', 'SST_Performance']:.1f}%")
+                 f"{summary_stats.at['mean', 'SST_Performance']:.1f}%",
+                 f"±{summary_stats.at['std', 'SST_Performance']:.1f}%")
     
     with col5:
         st.metric("Language", 
-                 f"{summary_stats.loc['mean', 'Language_Performance']:.1f}%",
-                 f"±{summary_stats.loc['std', 'Language_Performance']:.1f}%")
+                 f"{summary_stats.at['mean', 'Language_Performance']:.1f}%",
+                 f"±{summary_stats.at['std', 'Language_Performance']:.1f}%")
     
     # Performance Distribution
     st.markdown("### 📊 Performance Score Distributions")
     
-    fig = make_subplots(
-        rows=2, cols=2,
-        subplot_titles=('Overall Performance', 'Mathematics', 'Science', 'Social Science'),
-        specs=[[{"secondary_y": False}, {"secondary_y": False}],
-               [{"secondary_y": False}, {"secondary_y": False}]]
-    )
-    
-    # Overall Performance
-    fig.add_trace(
-        go.Histogram(x=df_2021['Overall_Performance'], name='Overall', nbinsx=30, opacity=0.7),
-        row=1, col=1
-    )
-    
-    # Mathematics
-    fig.add_trace(
-        go.Histogram(x=df_2021['Math_Performance'], name='Math', nbinsx=30, opacity=0.7),
-        row=1, col=2
-    )
-    
-    # Science
-    fig.add_trace(
-        go.Histogram(x=df_2021['Science_Performance'], name='Science', nbinsx=30, opacity=0.7),
-        row=2, col=1
-    )
-    
-    # Social Science
-    fig.add_trace(
-        go.Histogram(x=df_2021['SST_Performance'], name='SST', nbinsx=30, opacity=0.7),
-        row=2, col=2
-    )
-    
-    fig.update_layout(height=600, showlegend=False, title_text="Distribution of Performance Scores Across Districts")
+    fig = score_distribution_figure(df_2021)
     st.plotly_chart(fig, use_container_width=True)
     
     # State-wise Performance Analysis
     st.markdown("### 🏛️ State-wise Performance Rankings")
     
-    state_performance = df_2021.groupby('State')[performance_cols].mean().round(2)
+    state_performance = state_means(df_2021).round(2)
     state_performance['Overall_Rank'] = state_performance['Overall_Performance'].rank(ascending=False)
     state_performance = state_performance.sort_values('Overall_Performance', ascending=False)
     
-    # Top and Bottom performing states
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown("**🏆 Top 10 Performing States/UTs**")
-        top_states = state_performance.head(10)
-        
-        fig_top = px.bar(
-            x=top_states['Overall_Performance'], 
-            y=top_states.index,
-            orientation='h',
-            title="Top 10 States by Overall Performance",
-            color=top_states['Overall_Performance'],
-            color_continuous_scale='Viridis'
-        )
-        fig_top.update_layout(height=400, yaxis={'categoryorder': 'total ascending'})
-        st.plotly_chart(fig_top, use_container_width=True)
-    
-    with col2:
-        st.markdown("**📉 Bottom 10 Performing States/UTs**")
-        bottom_states = state_performance.tail(10)
-        
-        fig_bottom = px.bar(
-            x=bottom_states['Overall_Performance'], 
-            y=bottom_states.index,
-            orientation='h',
-            title="Bottom 10 States by Overall Performance",
-            color=bottom_states['Overall_Performance'],
-            color_continuous_scale='Reds'
-        )
-        fig_bottom.update_layout(height=400, yaxis={"categoryorder": "total descending"})
-        st.plotly_chart(fig_bottom, use_container_width=True)
-    
-    # Subject-wise State Comparison
-    st.markdown("### 📚 Subject-wise State Performance Comparison")
-    
-    # Select states for comparison
-    selected_states = st.multiselect(
-        "Select states to compare:",
-        options=state_performance.index.tolist(),
-        default=state_performance.head(5).index.tolist(),
-        max_selections=10
+    # Top and Bottom performing states share one figure, told apart by colour
+    st.markdown("**🏆 Top 10 and 📉 Bottom 10 Performing States/UTs**")
+    top_count = min(10, len(state_performance))
+    ranked_states = pd.concat([
+        state_performance.iloc[:top_count],
+        state_performance.iloc[max(top_count, len(state_performance) - 10):]
+    ])
+    standing = np.where(np.arange(len(ranked_states)) < top_count, 'Top 10', 'Bottom 10')
+    
+    fig_ranked = px.bar(
+        x=ranked_states['Overall_Performance'],
+        y=ranked_states.index,
+        orientation='h',
+        title="Top and Bottom 10 States by Overall Performance",
+        color=standing,
+        color_discrete_map={'Top 10': '#2ca02c', 'Bottom 10': '#d62728'},
+        labels={'x': 'Overall_Performance', 'y': 'State', 'color': ''}
     )
+    fig_ranked.update_layout(height=600, yaxis={'categoryorder': 'total ascending'})
+    st.plotly_chart(fig_ranked, use_container_width=True)
     
-    if selected_states:
-        comparison_data = state_performance.loc[selected_states, ['Math_Performance', 'Science_Performance', 'SST_Performance', 'Language_Performance']]
-        
-        fig_comparison = go.Figure()
-        
-        for subject in comparison_data.columns:
-            fig_comparison.add_trace(go.Bar(
-                name=subject.replace('_Performance', ''),
-                x=comparison_data.index,
-                y=comparison_data[subject],
-                text=comparison_data[subject].round(1),
-                textposition='auto'
-            ))
-        
-        fig_comparison.update_layout(
-            title="Subject-wise Performance Comparison",
-            xaxis_title="States/UTs",
-            yaxis_title="Performance Score (%)",
-            barmode='group',
-            height=500
-        )
-        
-        st.plotly_chart(fig_comparison, use_container_width=True)
+    show_state_comparison(state_performance)
     
     # Learning Outcome Analysis
     st.markdown("### 🎯 Most Challenging Learning Outcomes")
     
-    learning_outcome_cols = [col for col in df_2021.columns if col.startswith('Average_Performance') and 'Learning_Outcome' in col]
-    topic_performance = df_2021[learning_outcome_cols].mean().sort_values(ascending=True)
+    topic_performance = topic_means(df_2021)
     
-    # Clean up the names for better readability
-    topic_performance.index = topic_performance.index.str.replace('Average_Performance_Of_Students_In_', '').str.replace('_Learning_Outcome', '')
-    
-    hardest_topics = topic_performance.head(15)
-    easiest_topics = topic_performance.tail(15)
+    # Partial selection instead of sorting every outcome; the bar chart orders its own axis
+    hardest_topics = topic_performance.nsmallest(15)
     
     col1, col2 = st.columns(2)
     
@@ -640,34 +894,71 @@ def show_eda(df_2021):
         fig_hard.update_layout(height=500, yaxis={"categoryorder": "total ascending"})
         st.plotly_chart(fig_hard, use_container_width=True)
     
-def show_performance_analysis(df_2021):
-    """Display detailed performance analysis"""
-    st.markdown('<div class="section-header">📊 Advanced Performance Analysis</div>', unsafe_allow_html=True)
-    
-    # Performance Correlation Analysis
-    st.markdown("### 🔗 Subject Performance Correlations")
-    
-    performance_cols = ['Math_Performance', 'Science_Performance', 'SST_Performance', 'Language_Performance']
-    correlation_matrix = df_2021[performance_cols].corr()
-    
-    fig_corr = px.imshow(
-        correlation_matrix,
-        text_auto=True,
-        aspect="auto",
-        title="Correlation Matrix of Subject Performances",
-        color_continuous_scale='RdBu'
+def downsample_points(df, max_points=MAX_SCATTER_POINTS):
+    """Cap the number of rows sent to a scatter plot; the fixed seed keeps the sample stable across reruns"""
+    if len(df) <= max_points:
+        return df
+    return df.sample(max_points, random_state=0)
+
+@st.cache_data(hash_funcs=HASH_BY_IDENTITY)
+def survey_scale_density(df_2021, x_col, bins=(60, 40)):
+    """District counts on a grid of survey size against overall performance; empty cells are NaN so they render blank"""
+    x = df_2021[x_col].to_numpy(dtype=np.float64)
+    y = df_2021['Overall_Performance'].to_numpy(dtype=np.float64)
+    valid = ~(np.isnan(x) | np.isnan(y))
+    counts, x_edges, y_edges = np.histogram2d(x[valid], y[valid], bins=bins)
+    counts = np.where(counts > 0, counts, np.nan).T
+    return counts, (x_edges[:-1] + x_edges[1:]) / 2, (y_edges[:-1] + y_edges[1:]) / 2
+
+@st.cache_resource(show_spinner=False, hash_funcs=HASH_BY_IDENTITY)
+def survey_scale_heatmap(df_2021, x_col, title):
+    """Binned view of a survey-scale scatter: the figure carries one cell per bin instead of one marker per district.
+    Built once per data frame and axis, then reused across reruns"""
+    import plotly.express as px
+
+    counts, x_centers, y_centers = survey_scale_density(df_2021, x_col)
+    fig = px.imshow(
+        counts,
+        x=x_centers,
+        y=y_centers,
+        origin='lower',
+        aspect='auto',
+        color_continuous_scale='Viridis',
+        labels=dict(x=x_col, y='Overall_Performance', color='Districts'),
+        title=title
     )
-    fig_corr.update_layout(height=500)
-    st.plotly_chart(fig_corr, use_container_width=True)
-    
-    # Performance vs School/Student Count Analysis
+    fig.update_layout(height=400)
+    return fig
+
+@st.fragment
+def show_survey_scale(df_2021):
+    """Survey-scale charts; the raw-points toggle reruns only this block"""
+    import plotly.express as px
+
     st.markdown("### 🏫 Performance vs Survey Scale Analysis")
     
+    if not st.toggle("Show individual districts", value=False):
+        col1, col2 = st.columns(2)
+        with col1:
+            st.plotly_chart(survey_scale_heatmap(
+                df_2021, 'Number_Of_Schools_Surveyed', "Performance vs Number of Schools Surveyed"
+            ), use_container_width=True)
+        with col2:
+            st.plotly_chart(survey_scale_heatmap(
+                df_2021, 'Number_Of_Students_Surveyed', "Performance vs Number of Students Surveyed"
+            ), use_container_width=True)
+        return
+    
+    # Only the plotted columns are sampled and handed to plotly
+    survey_scale = downsample_points(df_2021[[
+        'Number_Of_Schools_Surveyed', 'Number_Of_Students_Surveyed', 'Overall_Performance', 'State', 'District'
+    ]])
+
     col1, col2 = st.columns(2)
-    
+
     with col1:
         fig_schools = px.scatter(
-            df_2021,
+            survey_scale,
             x='Number_Of_Schools_Surveyed',
             y='Overall_Performance',
             color='Overall_Performance',
@@ -678,10 +969,10 @@ def show_performance_analysis(df_2021):
         )
         fig_schools.update_layout(height=400)
         st.plotly_chart(fig_schools, use_container_width=True)
-    
+
     with col2:
         fig_students = px.scatter(
-            df_2021,
+            survey_scale,
             x='Number_Of_Students_Surveyed',
             y='Overall_Performance',
             color='Overall_Performance',
@@ -692,20 +983,105 @@ def show_performance_analysis(df_2021):
         )
         fig_students.update_layout(height=400)
         st.plotly_chart(fig_students, use_container_width=True)
+
+@st.cache_resource(show_spinner=False, hash_funcs=HASH_BY_IDENTITY)
+def state_frames(df_2021):
+    """Rows of each state, split once and ordered by overall score, so picking a state is a dict lookup"""
+    columns = ['District', 'Number_Of_Schools_Surveyed', 'Number_Of_Students_Surveyed', 'Overall_Performance'] + SUBJECT_COLS
+    return {
+        state: rows[columns].sort_values('Overall_Performance', kind='stable').reset_index(drop=True)
+        for state, rows in df_2021.groupby('State', observed=True)
+    }
+
+@st.cache_resource(show_spinner=False, hash_funcs=HASH_BY_IDENTITY)
+def state_detail_figures(df_2021, selected_state):
+    """Subject box plot and district bar chart for one state, built once per state"""
+    import plotly.express as px
+
+    state_data = state_frames(df_2021)[selected_state]
+    fig_state_dist = px.box(
+        state_data,
+        y=SUBJECT_COLS,
+        title=f"Subject Performance Distribution in {selected_state}"
+    )
+    fig_state_dist.update_layout(height=400)
+    
+    fig_state_districts = px.bar(
+        state_data,
+        x='Overall_Performance',
+        y='District',
+        orientation='h',
+        title=f"District Performance in {selected_state}",
+        color='Overall_Performance',
+        color_continuous_scale='Viridis'
+    )
+    fig_state_districts.update_layout(height=400, yaxis={'categoryorder': 'total ascending'})
+    return fig_state_dist, fig_state_districts
+
+@st.fragment
+def show_state_detail(df_2021):
+    """District breakdown for one selected state; changing the state reruns only this block"""
+    # Performance Distribution by State
+    st.markdown("### 📈 Performance Distribution by State")
+    
+    state_data_by_state = state_frames(df_2021)
+    selected_state = st.selectbox(
+        "Select a state to view district-wise performance distribution:",
+        options=sorted(state_data_by_state)
+    )
+    
+    state_data = state_data_by_state[selected_state]
+    
+    if len(state_data) > 0:
+        fig_state_dist, fig_state_districts = state_detail_figures(df_2021, selected_state)
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.plotly_chart(fig_state_dist, use_container_width=True)
+        
+        with col2:
+            st.plotly_chart(fig_state_districts, use_container_width=True)
+        
+        # State statistics
+        st.markdown(f"**📊 {selected_state} Statistics:**")
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("Districts", len(state_data))
+        with col2:
+            st.metric("Avg Performance", f"{state_data['Overall_Performance'].mean():.1f}%")
+        with col3:
+            st.metric("Best District", f"{state_data.loc[state_data['Overall_Performance'].idxmax(), 'District']}")
+        with col4:
+            st.metric("Schools Surveyed", f"{state_data['Number_Of_Schools_Surveyed'].sum():,}")
+
+def show_performance_analysis(df_2021):
+    """Display detailed performance analysis"""
+    import plotly.express as px
+    
+    st.markdown('<div class="section-header">📊 Advanced Performance Analysis</div>', unsafe_allow_html=True)
+    
+    # Performance Correlation Analysis
+    st.markdown("### 🔗 Subject Performance Correlations")
+    
+    fig_corr = correlation_figure(df_2021)
+    st.plotly_chart(fig_corr, use_container_width=True)
+    
+    # Performance vs School/Student Count Analysis
+    show_survey_scale(df_2021)
     
     # District Performance Analysis
     st.markdown("### 🏘️ District-Level Performance Analysis")
     
     # Top and bottom performing districts
-    district_performance = df_2021.groupby(['State', 'District'])['Overall_Performance'].mean().reset_index()
-    district_performance = district_performance.sort_values('Overall_Performance', ascending=False)
+    district_performance = district_means(df_2021)
     
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("**🏆 Top 20 Performing Districts**")
-        top_districts = district_performance.head(20)
-        top_districts['State_District'] = top_districts['District'] + ', ' + top_districts['State']
+        top_districts = district_performance.nlargest(20, 'Overall_Performance')
+        top_districts['State_District'] = top_districts['District'].astype(str) + ', ' + top_districts['State'].astype(str)
         
         fig_top_districts = px.bar(
             top_districts,
@@ -721,8 +1097,8 @@ def show_performance_analysis(df_2021):
     
     with col2:
         st.markdown("**📉 Bottom 20 Performing Districts**")
-        bottom_districts = district_performance.tail(20)
-        bottom_districts['State_District'] = bottom_districts['District'] + ', ' + bottom_districts['State']
+        bottom_districts = district_performance.nsmallest(20, 'Overall_Performance')
+        bottom_districts['State_District'] = bottom_districts['District'].astype(str) + ', ' + bottom_districts['State'].astype(str)
         
         fig_bottom_districts = px.bar(
             bottom_districts,
@@ -736,56 +1112,65 @@ def show_performance_analysis(df_2021):
         fig_bottom_districts.update_layout(height=600, yaxis={'categoryorder': 'total descending'})
         st.plotly_chart(fig_bottom_districts, use_container_width=True)
     
-    # Performance Distribution by State
-    st.markdown("### 📈 Performance Distribution by State")
+    show_state_detail(df_2021)
+
+@st.fragment
+def show_region_top_districts(df_2021_with_region):
+    """Top districts of the selected region; changing the region reruns only this block"""
+    import plotly.express as px
     
-    selected_state = st.selectbox(
-        "Select a state to view district-wise performance distribution:",
-        options=sorted(df_2021['State'].unique())
-    )
+    # Top districts by region
+    st.markdown("### 🏆 Top Performing Districts by Region")
     
-    state_data = df_2021[df_2021['State'] == selected_state]
+    # with_region() drops unused Region categories, so every option has districts
+    regions = df_2021_with_region['Region'].cat
+    selected_region = st.selectbox(
+        "Select a region to view top performing districts:",
+        options=sorted(regions.categories)
+    )
     
-    if len(state_data) > 0:
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            fig_state_dist = px.box(
-                state_data,
-                y=['Math_Performance', 'Science_Performance', 'SST_Performance', 'Language_Performance'],
-                title=f"Subject Performance Distribution in {selected_state}"
-            )
-            fig_state_dist.update_layout(height=400)
-            st.plotly_chart(fig_state_dist, use_container_width=True)
-        
-        with col2:
-            fig_state_districts = px.bar(
-                state_data.sort_values('Overall_Performance', ascending=True),
-                x='Overall_Performance',
-                y='District',
-                orientation='h',
-                title=f"District Performance in {selected_state}",
-                color='Overall_Performance',
-                color_continuous_scale='Viridis'
-            )
-            fig_state_districts.update_layout(height=400, yaxis={'categoryorder': 'total ascending'})
-            st.plotly_chart(fig_state_districts, use_container_width=True)
-        
-        # State statistics
-        st.markdown(f"**📊 {selected_state} Statistics:**")
-        col1, col2, col3, col4 = st.columns(4)
+    if selected_region != 'Other':
+        # Compare integer category codes instead of region labels
+        region_data = df_2021_with_region[regions.codes.to_numpy() == regions.categories.get_loc(selected_region)]
+        top_districts_region = region_data.nlargest(10, 'Overall_Performance')
         
-        with col1:
-            st.metric("Districts", len(state_data))
-        with col2:
-            st.metric("Avg Performance", f"{state_data["Overall_Performance"].mean():.1f}%")
-        with col3:
-            st.metric("Best District", f"{state_data.loc[state_data['Overall_Performance'].idxmax(), 'District']}")
-        with col4:
-            st.metric("Schools Surveyed", f"{state_data['Number_Of_Schools_Surveyed'].sum():,}")
+        fig_top_region = px.bar(
+            top_districts_region,
+            x='Overall_Performance',
+            y='District',
+            orientation='h',
+            title=f"Top 10 Districts in {selected_region} Region",
+            color='Overall_Performance',
+            color_continuous_scale='Greens',
+            hover_data=['State']
+        )
+        fig_top_region.update_layout(height=400, yaxis={'categoryorder': 'total ascending'})
+        st.plotly_chart(fig_top_region, use_container_width=True)
+
+@st.cache_resource(show_spinner=False, hash_funcs=HASH_BY_IDENTITY)
+def state_heatmap_figure(df_2021):
+    """Subject-by-state heatmap of the shared state means, built once per data frame"""
+    import plotly.express as px
+
+    # Create state performance matrix straight from the cached state means as a float32 array
+    heatmap_cols = SUBJECT_COLS + ['Overall_Performance']
+    state_performance = state_means(df_2021)
+    fig_heatmap = px.imshow(
+        state_performance[heatmap_cols].to_numpy(np.float32).T,
+        x=state_performance.index.tolist(),
+        y=heatmap_cols,
+        aspect="auto",
+        title="State-wise Performance Heatmap",
+        color_continuous_scale='RdYlGn',
+        labels=dict(x="States/UTs", y="Subjects", color="Performance %")
+    )
+    fig_heatmap.update_layout(height=400)
+    return fig_heatmap
 
 def show_district_mapping(df_2021):
     """Display district-level mapping visualization"""
+    import plotly.express as px
+    
     st.markdown('<div class="section-header">🗺️ District-Level Performance Mapping</div>', unsafe_allow_html=True)
     
     st.markdown("""
@@ -797,40 +1182,16 @@ def show_district_mapping(df_2021):
     # State-wise heatmap
     st.markdown("### 🌡️ State-wise Performance Heatmap")
     
-    # Create state performance matrix
-    state_performance = df_2021.groupby('State')[['Math_Performance', 'Science_Performance', 'SST_Performance', 'Language_Performance', 'Overall_Performance']].mean()
-    
-    fig_heatmap = px.imshow(
-        state_performance.T,
-        aspect="auto",
-        title="State-wise Performance Heatmap",
-        color_continuous_scale='RdYlGn',
-        labels=dict(x="States/UTs", y="Subjects", color="Performance %")
-    )
-    fig_heatmap.update_layout(height=400)
+    fig_heatmap = state_heatmap_figure(df_2021)
     st.plotly_chart(fig_heatmap, use_container_width=True)
     
     # Interactive scatter plot with geographical regions
     st.markdown("### 🌍 Regional Performance Analysis")
     
-    # Define geographical regions (simplified)
-    region_mapping = {
-        'North': ['Delhi', 'Haryana', 'Himachal Pradesh', 'Jammu and Kashmir', 'Punjab', 'Rajasthan', 'Uttarakhand', 'Uttar Pradesh', 'Chandigarh', 'Ladakh'],
-        'South': ['Andhra Pradesh', 'Karnataka', 'Kerala', 'Tamil Nadu', 'Telangana', 'Puducherry', 'Andaman and Nicobar Islands', 'Lakshadweep'],
-        'East': ['Bihar', 'Jharkhand', 'Odisha', 'West Bengal'],
-        'West': ['Goa', 'Gujarat', 'Maharashtra', 'Dadra and Nagar Haveli and Daman and Diu', 'Nagpur'],
-        'Central': ['Chhattisgarh', 'Madhya Pradesh']
-    }
-    
-    # Add region information
-    df_2021_with_region = df_2021.copy()
-    df_2021_with_region["Region"] = df_2021_with_region["State"].apply(
-        lambda x: next((region for region, states in region_mapping.items() if x in states), 'Other')
-    )
-    df_2021_with_region["Region"] = df_2021_with_region["Region"].astype(str)    
+    df_2021_with_region = with_region(df_2021)
     # Regional performance scatter plot
     fig_regional = px.scatter(
-        df_2021_with_region,
+        downsample_points(df_2021_with_region),
         x='Math_Performance',
         y='Science_Performance',
         color='Region',
@@ -845,20 +1206,13 @@ def show_district_mapping(df_2021):
     # District performance by region
     st.markdown("### 📊 Regional Performance Comparison")
     
-    regional_stats = df_2021_with_region.groupby('Region')[[
-        'Overall_Performance', 'Math_Performance', 'Science_Performance', 
-        'SST_Performance', 'Language_Performance'
-    ]].agg(['mean', 'std', 'count']).round(2)
-    
-    # Flatten column names
-    regional_stats.columns = [f"{col[1]}_{col[0]}" for col in regional_stats.columns]
-    regional_stats = regional_stats.reset_index()
+    region_summary = regional_stats(df_2021_with_region)
     
     col1, col2 = st.columns(2)
     
     with col1:
         fig_regional_bar = px.bar(
-            regional_stats,
+            region_summary,
             x='Region',
             y='mean_Overall_Performance',
             error_y='std_Overall_Performance',
@@ -870,17 +1224,19 @@ def show_district_mapping(df_2021):
         st.plotly_chart(fig_regional_bar, use_container_width=True)
     
     with col2:
-        fig_regional_subjects = go.Figure()
-        subjects = ['Math_Performance', 'Science_Performance', 'SST_Performance', 'Language_Performance']
-        
-        for subject in subjects:
-            fig_regional_subjects.add_trace(go.Bar(
-                name=subject.replace('_Performance', ''),
-                x=regional_stats['Region'],
-                y=regional_stats[f'mean_{subject}'],
-                error_y=dict(type='data', array=regional_stats[f'std_{subject}'])
-            ))
+        # Melt the mean and std columns into matching long-form rows, one per region and subject
+        regional_long = region_summary.melt(id_vars='Region', value_vars=[f'mean_{subject}' for subject in SUBJECT_COLS],
+                                            var_name='Subject', value_name='Performance')
+        regional_long['Std'] = region_summary.melt(value_vars=[f'std_{subject}' for subject in SUBJECT_COLS])['value'].to_numpy()
+        regional_long['Subject'] = regional_long['Subject'].str.replace('mean_', '').str.replace('_Performance', '')
         
+        fig_regional_subjects = px.bar(
+            regional_long,
+            x='Region',
+            y='Performance',
+            color='Subject',
+            error_y='Std'
+        )
         fig_regional_subjects.update_layout(
             title="Subject-wise Regional Performance",
             barmode='group',
@@ -888,30 +1244,7 @@ def show_district_mapping(df_2021):
         )
         st.plotly_chart(fig_regional_subjects, use_container_width=True)
     
-    # Top districts by region
-    st.markdown("### 🏆 Top Performing Districts by Region")
-    
-    selected_region = st.selectbox(
-        "Select a region to view top performing districts:",
-        options=sorted(df_2021_with_region['Region'].unique())
-    )
-    
-    if selected_region != 'Other':
-        region_data = df_2021_with_region[df_2021_with_region['Region'] == selected_region]
-        top_districts_region = region_data.nlargest(10, 'Overall_Performance')
-        
-        fig_top_region = px.bar(
-            top_districts_region,
-            x='Overall_Performance',
-            y='District',
-            orientation='h',
-            title=f"Top 10 Districts in {selected_region} Region",
-            color='Overall_Performance',
-            color_continuous_scale='Greens',
-            hover_data=['State']
-        )
-        fig_top_region.update_layout(height=400, yaxis={'categoryorder': 'total ascending'})
-        st.plotly_chart(fig_top_region, use_container_width=True)
+    show_region_top_districts(df_2021_with_region)
     
     # Performance density map alternative
     st.markdown("### 📍 Performance Density Visualization")
@@ -934,13 +1267,19 @@ def show_district_mapping(df_2021):
     st.markdown("#### Simulated Geographical Distribution")
     
     # Create mock coordinates for demonstration (in real implementation, use actual lat/long)
-    np.random.seed(42)
-    df_2021_coords = df_2021.copy()
-    df_2021_coords['lat'] = np.random.uniform(8, 37, len(df_2021))  # India's latitude range
-    df_2021_coords['lon'] = np.random.uniform(68, 97, len(df_2021))  # India's longitude range
+    # Pick the plotted districts first, so only they get coordinates; evenly spaced ranks over the sorted
+    # scores keep both extremes and the shape of the distribution, which a random sample can miss
+    ranked_scores = df_2021[['State', 'District', 'Overall_Performance']].dropna().sort_values('Overall_Performance')
+    df_2021_coords = ranked_scores.iloc[np.unique(np.linspace(0, len(ranked_scores) - 1, 100).round().astype(int))]
+    # A local generator keeps the simulated coordinates reproducible without touching NumPy's global state
+    rng = np.random.default_rng(42)
+    df_2021_coords = df_2021_coords.assign(
+        lat=rng.uniform(8, 37, len(df_2021_coords)),  # India's latitude range
+        lon=rng.uniform(68, 97, len(df_2021_coords))  # India's longitude range
+    )
     
     fig_map = px.scatter_mapbox(
-        df_2021_coords.sample(100),  # Sample for performance
+        df_2021_coords,
         lat='lat',
         lon='lon',
         color='Overall_Performance',
@@ -966,21 +1305,97 @@ def show_district_mapping(df_2021):
     libraries like Folium or Plotly with real geospatial data.
     """, unsafe_allow_html=False)
 
+@st.cache_data(hash_funcs=HASH_BY_IDENTITY)
+def state_ranking(df_2021):
+    """Mean overall performance per state, best first"""
+    return state_means(df_2021)['Overall_Performance'].sort_values(ascending=False)
+
+@st.cache_data(hash_funcs=HASH_BY_IDENTITY)
+def state_summary_csv(df_2021):
+    """State ranking by overall performance, serialized for download"""
+    return state_ranking(df_2021).to_csv().encode('utf-8')
+
+@st.cache_data(hash_funcs=HASH_BY_IDENTITY)
+def district_summary_csv(df_2021):
+    """Per-district performance scores, serialized for download"""
+    district_summary = df_2021[[
+        'State', 'District', 'Overall_Performance', 'Math_Performance', 
+        'Science_Performance', 'SST_Performance', 'Language_Performance'
+    ]]
+    return district_summary.to_csv(index=False).encode('utf-8')
+
+@st.cache_data(hash_funcs=HASH_BY_IDENTITY)
+def report_stats(df_2021):
+    """Figures quoted in the downloadable recommendations report"""
+    # One fused reduction for the four overall-score figures
+    overall = df_2021['Overall_Performance']
+    stats = overall.agg(['min', 'max', 'std', 'mean']).to_dict()
+    stats['districts'] = len(df_2021)
+    # Districts more than one standard deviation below the national average
+    stats['low_threshold'] = stats['mean'] - stats['std']
+    stats['low_count'] = int((overall.to_numpy() < stats['low_threshold']).sum())
+    # Plain (state, score) tuples, rounded in one vectorized step, so the report only has to print them
+    top_states = state_ranking(df_2021).head(5)
+    stats['top_states'] = list(zip(top_states.index, top_states.to_numpy(dtype=np.float64).round(1).tolist()))
+    return stats
+
+@st.cache_data(hash_funcs=HASH_BY_IDENTITY)
+def report_body(df_2021):
+    """Encoded report text below the header; it only depends on the data"""
+    stats = report_stats(df_2021)
+    top_lines = "\n".join(f"{i}. {state}: {perf}%" for i, (state, perf) in enumerate(stats['top_states'], 1))
+    return REPORT_TEMPLATE.format_map({**stats, 'top_lines': top_lines}).encode('utf-8')
+
+def build_report(df_2021):
+    """Prepend the timestamped header to the cached body and return a UTF-8 buffer for st.download_button"""
+    header = REPORT_HEADER.format(generated=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    return io.BytesIO(header.encode('utf-8') + report_body(df_2021))
+
+def extreme_districts(district_scores, rows, k=10, largest=False):
+    """The k lowest (or highest) scoring districts among the given row positions, ordered like nsmallest/nlargest"""
+    scores = district_scores['Overall_Performance'].to_numpy()[rows]
+    if largest:
+        scores = -scores
+    # Linear-time selection of the k extremes; only those k rows are sorted
+    if len(rows) > k:
+        keep = np.argpartition(scores, k)[:k]
+        rows, scores = rows[keep], scores[keep]
+    return district_scores.iloc[rows[np.lexsort((rows, scores))]]
+
 def show_insights_and_recommendations(df_2021):
     """Display key insights and recommendations"""
     st.markdown('<div class="section-header">💡 Key Insights & Recommendations</div>', unsafe_allow_html=True)
     
     # Calculate key metrics for insights
-    overall_mean = df_2021['Overall_Performance'].mean()
-    math_mean = df_2021['Math_Performance'].mean()
-    science_mean = df_2021['Science_Performance'].mean()
-    sst_mean = df_2021['SST_Performance'].mean()
-    language_mean = df_2021['Language_Performance'].mean()
+    national_stats = performance_summary(df_2021)
+    national_means = national_stats.loc['mean']
+    overall_mean = national_means['Overall_Performance']
+    overall_std = national_stats.at['std', 'Overall_Performance']
+    overall_min = national_stats.at['min', 'Overall_Performance']
+    overall_max = national_stats.at['max', 'Overall_Performance']
+    math_mean = national_means['Math_Performance']
+    science_mean = national_means['Science_Performance']
+    
+    subject_names = {
+        'Math_Performance': 'Mathematics',
+        'Science_Performance': 'Science',
+        'SST_Performance': 'Social Science',
+        'Language_Performance': 'Language'
+    }
+    subject_means = national_means[list(subject_names)]
+    strongest_subject = subject_means.idxmax()
+    weakest_subject = subject_means.idxmin()
     
-    state_performance = df_2021.groupby('State')['Overall_Performance'].mean().sort_values(ascending=False)
+    state_performance = state_ranking(df_2021)
     top_state = state_performance.index[0]
     bottom_state = state_performance.index[-1]
     
+    # Count on the NumPy arrays rather than materializing filtered frames
+    district_count = len(df_2021)
+    districts_above_average = int((df_2021['Overall_Performance'].to_numpy() > overall_mean).sum())
+    share_above_average = districts_above_average / district_count * 100
+    states_above_average = int((state_performance.to_numpy() > overall_mean).sum())
+    
     # Key Insights
     st.markdown("### 🔍 Key Findings")
     
@@ -988,16 +1403,16 @@ def show_insights_and_recommendations(df_2021):
         {
             "title": "📊 Overall Performance Landscape",
             "content": f"""- **National Average:** {overall_mean:.1f}% across all districts
-            - **Performance Range:** {df_2021['Overall_Performance'].min():.1f}% to {df_2021['Overall_Performance'].max():.1f}%
-            - **Standard Deviation:** {df_2021['Overall_Performance'].std():.1f}% indicating significant variation
-            - **Districts Above Average:** {len(df_2021[df_2021['Overall_Performance'] > overall_mean])} out of {len(df_2021)} ({len(df_2021[df_2021['Overall_Performance'] > overall_mean])/len(df_2021)*100:.1f}%)
+            - **Performance Range:** {overall_min:.1f}% to {overall_max:.1f}%
+            - **Standard Deviation:** {overall_std:.1f}% indicating significant variation
+            - **Districts Above Average:** {districts_above_average} out of {district_count} ({share_above_average:.1f}%)
             """
         },
         {
             "title": "📚 Subject-wise Performance Analysis",
-            "content": f"""- **Strongest Subject:** {'Language' if language_mean == max(math_mean, science_mean, sst_mean, language_mean) else 'Mathematics' if math_mean == max(math_mean, science_mean, sst_mean, language_mean) else 'Science' if science_mean == max(math_mean, science_mean, sst_mean, language_mean) else 'Social Science'} ({max(math_mean, science_mean, sst_mean, language_mean):.1f}%)
-            - **Most Challenging Subject:** {'Language' if language_mean == min(math_mean, science_mean, sst_mean, language_mean) else 'Mathematics' if math_mean == min(math_mean, science_mean, sst_mean, language_mean) else 'Science' if science_mean == min(math_mean, science_mean, sst_mean, language_mean) else 'Social Science'} ({min(math_mean, science_mean, sst_mean, language_mean):.1f}%)
-            - **Subject Performance Gap:** {max(math_mean, science_mean, sst_mean, language_mean) - min(math_mean, science_mean, sst_mean, language_mean):.1f} percentage points
+            "content": f"""- **Strongest Subject:** {subject_names[strongest_subject]} ({subject_means[strongest_subject]:.1f}%)
+            - **Most Challenging Subject:** {subject_names[weakest_subject]} ({subject_means[weakest_subject]:.1f}%)
+            - **Subject Performance Gap:** {subject_means[strongest_subject] - subject_means[weakest_subject]:.1f} percentage points
             - **Mathematics Performance:** {math_mean:.1f}% (Critical for STEM education)
             """
         },
@@ -1006,7 +1421,7 @@ def show_insights_and_recommendations(df_2021):
             "content": f"""- **Top Performing State/UT:** {top_state} ({state_performance.iloc[0]:.1f}%)
             - **Lowest Performing State/UT:** {bottom_state} ({state_performance.iloc[-1]:.1f}%)
             - **Performance Gap:** {state_performance.iloc[0] - state_performance.iloc[-1]:.1f} percentage points
-            - **States Above National Average:** {len(state_performance[state_performance > overall_mean])} out of {len(state_performance)}
+            - **States Above National Average:** {states_above_average} out of {len(state_performance)}
             """
         }
     ]
@@ -1018,33 +1433,34 @@ def show_insights_and_recommendations(df_2021):
     # Critical Areas Needing Attention
     st.markdown("### ⚠️ Critical Areas Needing Attention")
     
-    # Find districts with very low performance
-    low_performing_districts = df_2021[df_2021['Overall_Performance'] < (overall_mean - df_2021['Overall_Performance'].std())]
+    # Districts more than one standard deviation from the national average; only the listed columns are kept
+    low_threshold = overall_mean - overall_std
+    high_threshold = overall_mean + overall_std
+    district_scores = df_2021[['State', 'District', 'Overall_Performance']]
+    scores = district_scores['Overall_Performance'].to_numpy()
+    # Row positions beyond each threshold, taken once from the score array; NaN scores fail both tests
+    low_rows = np.flatnonzero(scores < low_threshold)
+    high_rows = np.flatnonzero(scores > high_threshold)
     
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("**🔴 Districts Requiring Immediate Intervention**")
-        st.markdown(f"**Count:** {len(low_performing_districts)} districts")
-        st.markdown(f"**Criteria:** Performance below {(overall_mean - df_2021['Overall_Performance'].std()):.1f}%")
+        st.markdown(f"**Count:** {len(low_rows)} districts")
+        st.markdown(f"**Criteria:** Performance below {low_threshold:.1f}%")
         
-        if len(low_performing_districts) > 0:
-            worst_districts = low_performing_districts.nsmallest(10, 'Overall_Performance')[[
-                'State', 'District', 'Overall_Performance'
-            ]]
-            st.dataframe(worst_districts, use_container_width=True)
+        if len(low_rows) > 0:
+            worst_districts = extreme_districts(district_scores, low_rows)
+            st.dataframe(worst_districts, use_container_width=True, hide_index=True)
     
     with col2:
         st.markdown("**📈 High-Performing Districts (Best Practices)**")
-        high_performing_districts = df_2021[df_2021['Overall_Performance'] > (overall_mean + df_2021['Overall_Performance'].std())]
-        st.markdown(f"**Count:** {len(high_performing_districts)} districts")
-        st.markdown(f"**Criteria:** Performance above {(overall_mean + df_2021['Overall_Performance'].std()):.1f}%")
+        st.markdown(f"**Count:** {len(high_rows)} districts")
+        st.markdown(f"**Criteria:** Performance above {high_threshold:.1f}%")
         
-        if len(high_performing_districts) > 0:
-            best_districts = high_performing_districts.nlargest(10, 'Overall_Performance')[[
-                'State', 'District', 'Overall_Performance'
-            ]]
-            st.dataframe(best_districts, use_container_width=True)
+        if len(high_rows) > 0:
+            best_districts = extreme_districts(district_scores, high_rows, largest=True)
+            st.dataframe(best_districts, use_container_width=True, hide_index=True)
     
     # Recommendations
     st.markdown("### 🎯 Strategic Recommendations")
@@ -1101,8 +1517,10 @@ def show_insights_and_recommendations(df_2021):
     
     st.markdown("**States/UTs Leading in Educational Excellence:**")
     
+    # Per-state rows come from the cached split, not a string comparison over every district
+    state_data_by_state = state_frames(df_2021)
     for i, (state, performance) in enumerate(consistent_performers.items(), 1):
-        state_data = df_2021[df_2021['State'] == state]
+        state_data = state_data_by_state[state]
         avg_schools = state_data['Number_Of_Schools_Surveyed'].mean()
         avg_students = state_data['Number_Of_Students_Surveyed'].mean()
         
@@ -1138,52 +1556,30 @@ def show_insights_and_recommendations(df_2021):
     
     col1, col2, col3 = st.columns(3)
     
+    # The CSV bytes are cached, so the download buttons can be shown directly without a confirm button
     with col1:
-        if st.button("📊 Download State Performance Summary"):
-            csv = state_performance.to_csv()
-            st.download_button(
-                label="Download CSV",
-                data=csv,
-                file_name="state_performance_summary.csv",
-                mime="text/csv"
-            )
+        st.download_button(
+            label="📊 Download State Performance Summary",
+            data=state_summary_csv(df_2021),
+            file_name="state_performance_summary.csv",
+            mime="text/csv"
+        )
     
     with col2:
-        if st.button("📈 Download District Analysis"):
-            district_summary = df_2021[[
-                'State', 'District', 'Overall_Performance', 'Math_Performance', 
-                'Science_Performance', 'SST_Performance', 'Language_Performance'
-            ]]
-            csv = district_summary.to_csv(index=False)
-            st.download_button(
-                label="Download CSV",
-                data=csv,
-                file_name="district_performance_analysis.csv",
-                mime="text/csv"
-            )
+        st.download_button(
+            label="📈 Download District Analysis",
+            data=district_summary_csv(df_2021),
+            file_name="district_performance_analysis.csv",
+            mime="text/csv"
+        )
     
     with col3:
-        if st.button("🎯 Download Recommendations Report"):
-            report_content = f"""National Achievement Survey (NAS) Analysis Report
-            Generated on: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}
-            
-            EXECUTIVE SUMMARY:
-            - National Average Performance: {overall_mean:.1f}%
-            - Total Districts Analyzed: {len(df_2021)}
-            - Performance Range: {df_2021['Overall_Performance'].min():.1f}% - {df_2021['Overall_Performance'].max():.1f}%
-            
-            TOP PERFORMING STATES:
-            {chr(10).join([f"{i+1}. {state}: {perf:.1f}%" for i, (state, perf) in enumerate(state_performance.head(5).items())])}
-            
-            CRITICAL INTERVENTION REQUIRED:
-            {len(low_performing_districts)} districts performing below {(overall_mean - df_2021['Overall_Performance'].std()):.1f}%
-            
-            For detailed analysis and recommendations, refer to the full dashboard.
-            """
-            
+        # Nothing is rendered or cached for the report unless it is asked for, and the
+        # text itself is only assembled when the download is clicked
+        if st.checkbox("🎯 Generate downloadable report"):
             st.download_button(
-                label="Download Report",
-                data=report_content,
+                label="Download Recommendations Report",
+                data=lambda: build_report(df_2021),
                 file_name="nas_analysis_report.txt",
                 mime="text/plain"
             )